@@ -37,6 +37,16 @@ def main() -> None:
     for reference in parser.results["observations"]:
         logging.info(OBSERVATIONS[reference])
 
+    for embedded in parser.results["objects"]:
+        logging.info(
+            "Embedded object (class %s, %d bytes) has SHA256 %s",
+            embedded["class"],
+            embedded["size"],
+            embedded["sha256"],
+        )
+        if embedded["streams"]:
+            logging.info("OLE streams: %s", ", ".join(embedded["streams"]))
+
     rules = []
     if parser.results["loose_strings"]:
         logging.info(
@@ -24,6 +24,8 @@ OBSERVATIONS = {
     "OBS005": "Document contains information group tags",
     "OBS006": "Document contains image identifiers (bliptags)",
     "OBS007": "Document contains change tracking (RSID tags)",
+    "OBS008": "Document contains embedded objects (objdata)",
+    "OBS009": "Document contains raw binary data (\\bin control words)",
 }
 
 
@@ -47,6 +49,7 @@ class RtfAnalyser:  # pylint: disable=too-few-public-methods
             "loose_strings": set(),
             "strict_strings": set(),
             "observations": [],
+            "objects": [],
         }
         self._risky_items = risky_items
 
@@ -103,6 +106,7 @@ class RtfAnalyser:  # pylint: disable=too-few-public-methods
         self._find_rsid_tags()
         self._find_blip_tags()
         self._find_image_sizes()
+        self._find_objects(data)
         if self._risky_items:
             self._find_information_group()
 
@@ -139,6 +143,50 @@ class RtfAnalyser:  # pylint: disable=too-few-public-methods
             logging.debug("Found %d embedded image(s) with set height/width", found)
             self._add_observation("OBS004")
 
+    def _find_objects(self, data: bytearray):
+        """
+        Find embedded objects, which are the usual location of a malicious payload.  The
+        \\objclass tag is recorded as a string and each object is decoded so that the payload
+        can be hashed.  The decoding works on the raw bytes as \\bin data is not ASCII.
+
+        Hashes are stored in the "objects" results rather than as strings, because the decoded
+        payload does not appear verbatim in the document.
+
+        Args:
+            data: the raw RTF document contents
+        """
+
+        for match in re.finditer(
+            r"(?P<whole_tag>{\\\*\\objclass\s+[^}]+})", self._data
+        ):
+            logging.debug("Object class tag: %s", match.group("whole_tag"))
+            self.results["loose_strings"].add(match.group("whole_tag"))
+
+        if re.search(rb"\\bin\d", data):
+            logging.debug("Found raw binary data in this document")
+            self._add_observation("OBS009")
+
+        if "objdata" not in self._data:
+            logging.debug("Did not find any embedded objects")
+            return
+
+        # Imported here so documents without objects don't pay to load hashlib etc.
+        from .objects import find_objects  # pylint: disable=import-outside-toplevel
+
+        for embedded in find_objects(data):
+            logging.debug(
+                "Embedded object class %s, %d bytes, SHA256 %s, streams: %s",
+                embedded["class"],
+                embedded["size"],
+                embedded["sha256"],
+                ", ".join(embedded["streams"]),
+            )
+            self.results["objects"].append(embedded)
+
+        if self.results["objects"]:
+            logging.debug("Found %d embedded object(s)", len(self.results["objects"]))
+            self._add_observation("OBS008")
+
     def _find_information_group(self):
         """
         Search for the document information group, which is optional but may be added by some
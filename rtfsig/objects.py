@@ -0,0 +1,383 @@
+"""
+Utility module to extract embedded objects (\\objdata groups) from RTF documents.
+
+Object data is stored as hex, often with whitespace, control words or ignorable groups mixed
+in to evade simple scanners, and may also contain raw \\binN runs.  The decoder below works on
+the raw document bytes and yields the payload in chunks, so large objects are hashed without
+ever holding the whole decoded object in memory.
+"""
+
+import binascii
+import hashlib
+import itertools
+import logging
+import re
+import struct
+
+
+# Hex is decoded in slices of this many input bytes, starting small and doubling so that
+# little of the document following a small object is read
+CHUNK_SIZE = 1024 * 1024
+INITIAL_CHUNK_SIZE = 1024
+
+# Native data up to this size is kept in memory so OLE stream names can be listed
+OLE_PARSE_LIMIT = 16 * 1024 * 1024
+
+# Give up looking for an OLE1 header if it is not found in this many bytes
+OLE1_HEADER_LIMIT = 64 * 1024
+
+OLE2_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+_HEX_DIGITS = b"0123456789abcdefABCDEF"
+_NON_HEX = bytes(i for i in range(256) if i not in _HEX_DIGITS)
+
+_OBJDATA = re.compile(rb"\\objdata(?![a-zA-Z])-?\d* ?")
+
+_BIN = re.compile(rb"\\bin(\d+) ?")
+
+# Control words and control symbols, other than \binN and \* which change how data is read
+_PLAIN = re.compile(rb"\\(?:(?!bin\d)[a-zA-Z]+-?\d* ?|[^*a-zA-Z])", re.DOTALL)
+
+# Innermost groups, ignorable groups are removed and the content of others is kept
+_IGNORABLE_GROUP = re.compile(rb"\{\s*\\\*[^{}]*\}")
+_GROUP = re.compile(rb"\{([^{}\\]*)\}")
+
+# Opening braces include any \* so that ignorable groups can be found
+_BRACE = re.compile(rb"[{}](?:\s*\\\*)?")
+
+
+def find_objects(data: bytes) -> list:
+    """
+    Find and decode every \\objdata group in a document.
+
+    Args:
+        data: the raw RTF document contents
+
+    Returns:
+        A list of dictionaries, one per object, see `analyse_object`
+    """
+    objects = []
+    for match in _OBJDATA.finditer(data):
+        logging.debug("Found objdata at offset %d", match.start())
+        objects.append(analyse_object(iter_objdata(data, match.end())))
+
+    return objects
+
+
+def iter_objdata(data: bytes, start: int):
+    """
+    Decode the contents of an \\objdata group, starting immediately after the control word and
+    stopping at the brace which closes the group.
+
+    Whitespace and other non-hex characters are dropped, as are control words and the contents
+    of ignorable ({\\*...}) groups.  Data following \\binN is passed through unchanged.
+
+    Args:
+        data: the raw RTF document contents
+        start: offset of the first byte after \\objdata
+
+    Yields:
+        Chunks of decoded bytes, data following \\binN is a memoryview to avoid a copy
+    """
+    pos = start
+    depth = 0
+    skip_depth = None
+    pending = b""
+    size = min(INITIAL_CHUNK_SIZE, CHUNK_SIZE)
+
+    while pos < len(data):
+        # Only search the next segment (plus room for the length), searching to the end of the
+        # document for every object would make documents with many objects very slow
+        binary = _BIN.search(data, pos, pos + size + 32)
+        limit = binary.start() if binary else len(data)
+        end = _segment_end(data, pos, limit, size)
+        if pos == start:
+            # Most objects have no groups, so the first brace is likely to close the object
+            brace = data.find(b"}", pos, end)
+            if brace != -1:
+                end = brace + 1
+        size = min(size * 2, CHUNK_SIZE)
+
+        text, depth, skip_depth, closed = _strip_segment(
+            data[pos:end], depth, skip_depth
+        )
+        decoded, pending = _decode_hex(text, pending)
+        if decoded:
+            yield decoded
+
+        if closed:
+            break
+
+        pos = end
+        if pos == limit and binary:
+            pos = binary.end() + int(binary.group(1))
+            if skip_depth is None:
+                yield memoryview(data)[binary.end() : pos]
+
+    if pending:
+        logging.debug("Ignoring trailing nibble in objdata")
+
+
+def _segment_end(data: bytes, start: int, limit: int, size: int) -> int:
+    """
+    Find the end of the next segment to decode, which is at most `size` bytes long.  If the
+    segment is cut short it ends before a control word or group so that neither is split.
+
+    Args:
+        data: the raw RTF document contents
+        start: offset of the start of the segment
+        limit: offset the segment must not extend past, e.g. the next \\binN
+        size: the maximum length of the segment
+
+    Returns:
+        The offset of the end of the segment
+    """
+    end = min(start + size, limit)
+    if end == limit:
+        return end
+
+    lookback = max(start, end - 128)
+    cut = max(data.rfind(b"\\", lookback, end), data.rfind(b"{", lookback, end))
+    while cut > start and data[cut - 1] in b"\\{ \t\r\n":
+        cut -= 1
+
+    if cut > start:
+        return cut
+
+    # There is nowhere to cut, so extend the segment instead of splitting a control word
+    backslash = data.rfind(b"\\", start, end)
+    match = _PLAIN.match(data, backslash, limit) if backslash != -1 else None
+    return max(end, match.end()) if match else end
+
+
+def _strip_segment(text: bytes, depth: int, skip_depth: int):
+    """
+    Remove everything except hex from a segment of an \\objdata group.
+
+    Control words and balanced groups are removed in bulk with regular expressions, so junk
+    interleaved with the hex costs little more than the hex itself.  Any braces left (groups
+    which span segments and the brace closing the object) are then handled one at a time.
+
+    Args:
+        text: the segment, which must not contain \\binN
+        depth: group depth at the start of the segment, relative to the \\objdata group
+        skip_depth: depth of the ignorable group being skipped, or None
+
+    Returns:
+        A tuple of (text containing the hex, depth, skip_depth, whether the object was closed)
+    """
+    # Searching for a single byte is much faster than a regex, so clean hex skips the regexes
+    if b"\\" in text:
+        # Junk is replaced rather than removed throughout, so that "{\\b0 \\*" does not become
+        # an ignorable group
+        text = _PLAIN.sub(b".", text)
+
+    changed = b"{" in text
+    while changed:
+        # Empty groups are the most common junk and bytes.replace is quicker than a regex
+        text = text.replace(b"{}", b".")
+        text, removed = _IGNORABLE_GROUP.subn(b".", text)
+        text, unwrapped = _GROUP.subn(rb".\1", text)
+        changed = removed or unwrapped
+
+    if b"{" not in text and b"}" not in text:
+        return (text if skip_depth is None else b""), depth, skip_depth, False
+
+    parts = []
+    last = 0
+    for match in _BRACE.finditer(text):
+        if skip_depth is None:
+            parts.append(text[last : match.start()])
+        last = match.end()
+
+        if match.group(0)[0] == ord("{"):
+            depth += 1
+            if skip_depth is None and match.group().endswith(b"*"):
+                skip_depth = depth
+        elif depth == 0:
+            return b"".join(parts), depth, skip_depth, True
+        else:
+            if skip_depth == depth:
+                skip_depth = None
+            depth -= 1
+
+    if skip_depth is None:
+        parts.append(text[last:])
+
+    return b"".join(parts), depth, skip_depth, False
+
+
+def _decode_hex(text: bytes, pending: bytes):
+    """
+    Decode hex, ignoring any non-hex characters.
+
+    Args:
+        text: the hex to decode
+        pending: an odd nibble left over from the previous call
+
+    Returns:
+        A tuple of (decoded bytes, any odd nibble left at the end of `text`)
+    """
+    digits = pending + text.translate(None, _NON_HEX)
+    if len(digits) % 2:
+        return binascii.unhexlify(digits[:-1]), digits[-1:]
+
+    return binascii.unhexlify(digits), b""
+
+
+def analyse_object(chunks) -> dict:
+    """
+    Consume a stream of decoded object data, parsing the OLE1 header and hashing the native
+    data (the embedded OLE2 file or Package).  If no OLE1 header is found the entire object is
+    hashed instead.
+
+    Args:
+        chunks: an iterable of decoded bytes, e.g. from `iter_objdata`
+
+    Returns:
+        A dictionary containing the object class (or None), size and SHA256 of the payload and
+        a list of OLE stream names (empty if the payload is not an OLE2 file)
+    """
+    chunks = iter(chunks)
+    head = bytearray()
+    rest = b""
+    header = None
+    for chunk in chunks:
+        # Only the start of the object is copied, the rest of a large chunk is passed on as is
+        chunk = memoryview(chunk)
+        room = OLE1_HEADER_LIMIT - len(head)
+        head += chunk[:room]
+        rest = chunk[room:]
+        header = _parse_ole1_header(head)
+        if header or len(head) >= OLE1_HEADER_LIMIT:
+            break
+
+    if header:
+        class_name, native_offset, native_size = header
+        payload = memoryview(head)[native_offset:]
+    else:
+        logging.debug("Object does not have a valid OLE1 header, hashing all data")
+        class_name, native_size = None, None
+        payload = head
+
+    digest = hashlib.sha256()
+    size = 0
+    buffered = []
+    for chunk in _chain_limited(itertools.chain((payload, rest), chunks), native_size):
+        digest.update(chunk)
+        size += len(chunk)
+        if size <= OLE_PARSE_LIMIT:
+            buffered.append(chunk)
+
+    streams = []
+    if size <= OLE_PARSE_LIMIT:
+        native_data = b"".join(buffered)
+        if native_data.startswith(OLE2_MAGIC):
+            streams = ole_stream_names(native_data)
+
+    return {
+        "class": class_name,
+        "size": size,
+        "sha256": digest.hexdigest(),
+        "streams": streams,
+    }
+
+
+def _chain_limited(chunks, limit: int):
+    """
+    Yield every chunk in `chunks`, stopping after `limit` bytes (if set).
+    """
+    for chunk in chunks:
+        if limit is not None:
+            if limit <= 0:
+                return
+            chunk = chunk[:limit]
+            limit -= len(chunk)
+        if chunk:
+            yield chunk
+
+
+def _parse_ole1_header(head: bytes):
+    """
+    Parse an OLE1 "ObjectHeader" for an embedded object ([MS-OLEDS] 2.2.4).
+
+    Args:
+        head: the start of the decoded object data
+
+    Returns:
+        A tuple of (class name, offset of native data, native data size) or None if the header
+        is incomplete or invalid
+    """
+    try:
+        _, format_id = struct.unpack_from("<II", head, 0)
+        if format_id != 2:
+            return None
+
+        offset = 8
+        fields = []
+        # ClassName, TopicName and ItemName are length prefixed, null terminated ANSI strings
+        for _ in range(3):
+            (length,) = struct.unpack_from("<I", head, offset)
+            offset += 4
+            if length > OLE1_HEADER_LIMIT or len(head) < offset + length:
+                return None
+            fields.append(bytes(head[offset : offset + length]).rstrip(b"\x00"))
+            offset += length
+
+        (native_size,) = struct.unpack_from("<I", head, offset)
+
+    except struct.error:
+        return None
+
+    return fields[0].decode("ascii", "replace"), offset + 4, native_size
+
+
+def ole_stream_names(data: bytes) -> list:
+    """
+    List the stream names in an OLE2 compound file ([MS-CFB]), reading only the directory.
+    Files with more than 109 FAT sectors are not fully supported and may return partial
+    results.
+
+    Args:
+        data: the complete compound file
+
+    Returns:
+        A sorted list of stream names
+    """
+    if len(data) < 512 or not data.startswith(OLE2_MAGIC):
+        return []
+
+    (sector_shift,) = struct.unpack_from("<H", data, 0x1E)
+    num_fat_sectors, first_dir_sector = struct.unpack_from("<II", data, 0x2C)
+    if sector_shift not in (9, 12):
+        return []
+    sector_size = 1 << sector_shift
+
+    def read_sector(sector):
+        offset = (sector + 1) * sector_size
+        return data[offset : offset + sector_size]
+
+    fat = []
+    difat = struct.unpack_from("<109I", data, 0x4C)
+    for sector in difat[: min(num_fat_sectors, 109)]:
+        raw = read_sector(sector)
+        fat.extend(struct.unpack(f"<{len(raw) // 4}I", raw[: len(raw) // 4 * 4]))
+
+    names = set()
+    sector = first_dir_sector
+    seen = set()
+    while sector < len(fat) and sector not in seen:
+        seen.add(sector)
+        raw = read_sector(sector)
+        for offset in range(0, len(raw) - 127, 128):
+            name_length, entry_type = struct.unpack_from("<HB", raw, offset + 0x40)
+            # Type 2 is a stream, storages and the root entry are ignored
+            if entry_type == 2 and 2 <= name_length <= 64:
+                names.add(
+                    raw[offset : offset + name_length - 2].decode(
+                        "utf-16-le", "replace"
+                    )
+                )
+        sector = fat[sector]
+
+    return sorted(names)
@@ -1,31 +1,33 @@
 """
-Utility module that uses Jinja2 to generate Yara rules from a basic template.
+Utility module to generate Yara rules from a basic template.
+
+The template is split into precompiled parts and joined with plain string operations, which
+avoids the start-up cost of a templating engine.  Output is identical to the Jinja2 template
+used by earlier versions.
 """
 
-from jinja2 import Template
 from . import VERSION_STRING
 
+RULE_HEADER = (
+    "\n"
+    "rule {rule_name} {{\n"
+    "  meta:\n"
+    '    description = "{description}"\n'
+    f'    generated_by = "rtfsig version {VERSION_STRING}"\n'
+    "\n"
+    "  strings:\n"
+    "    "
+)
+RULE_STRING = '$ = "{}" ascii\n    '
+RULE_FOOTER = "\n  condition:\n    uint32be(0) == 0x7b5c7274 and any of them\n}\n"
 
-RULE_TEMPLATE = """
-rule {{ rule_name }} {
-  meta:
-    description = "{{ description }}"
-    generated_by = "rtfsig version {{ version }}"
-
-  strings:
-    {% for string in strings -%}
-    $ = "{{ string }}" ascii
-    {% endfor %}
-  condition:
-    uint32be(0) == 0x7b5c7274 and any of them
-}
-
-"""
+# Replace backslash and double quotes to ensure valid rules
+_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"'})
 
 
 def generate_yara_rule(name: str, description: str, strings: list) -> str:
     """
-    Generate the text for a Yara rule using the Jinja2 templating engine.
+    Generate the text for a Yara rule.
 
     Args:
         name: the rule name to generate
@@ -35,19 +37,8 @@ def generate_yara_rule(name: str, description: str, strings: list) -> str:
     Returns:
         A string containing a Yara rule
     """
-    template = Template(RULE_TEMPLATE)
-
-    safe_strings = []
-    for string in strings:
-        # Replace backslash and double quotes to ensure valid rules
-        string = string.replace("\\", "\\\\")
-        string = string.replace('"', '\\"')
-        safe_strings.append(string)
-
-    args = {
-        "rule_name": name,
-        "description": description,
-        "strings": safe_strings,
-        "version": VERSION_STRING,
-    }
-    return template.render(args)
+    parts = [RULE_HEADER.format(rule_name=name, description=description)]
+    parts.extend(RULE_STRING.format(string.translate(_ESCAPES)) for string in strings)
+    parts.append(RULE_FOOTER)
+
+    return "".join(parts)
@@ -5,7 +5,7 @@ with open("README.md", "r") as fh:
     long_description = fh.read()
 
 docs_require = []
-tests_require = ["pylint", "pytest", "pytest-cov", "plyara"]
+tests_require = ["pylint", "pytest", "pytest-cov", "plyara", "Jinja2==3.1.6"]
 dev_require = ["black", "tox", "twine", "wheel"]
 
 setuptools.setup(
@@ -27,7 +27,7 @@ setuptools.setup(
         "Development Status :: 4 - Beta",
         "Topic :: Security",
     ],
-    install_requires=["Jinja2==3.1.6",],
+    install_requires=[],
     extras_require={
         "docs": docs_require,
         "tests": tests_require,
@@ -0,0 +1,236 @@
+"""
+Test cases for embedded object extraction.
+"""
+
+import hashlib
+import struct
+import tracemalloc
+from rtfsig import objects
+from rtfsig.core import RtfAnalyser
+from rtfsig.objects import analyse_object, iter_objdata, ole_stream_names
+
+
+def _ole1_object(class_name: bytes, native_data: bytes) -> bytes:
+    """
+    Build an OLE1 embedded object containing the given native data.
+    """
+    header = struct.pack("<II", 0x501, 2)
+    for field in (class_name + b"\x00", b"\x00", b"\x00"):
+        header += struct.pack("<I", len(field)) + field
+    return header + struct.pack("<I", len(native_data)) + native_data
+
+
+def _ole2_file(stream_name: str) -> bytes:
+    """
+    Build a minimal compound file with a FAT sector, a directory sector and a single stream.
+    """
+    header = bytearray(512)
+    header[0:8] = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+    struct.pack_into("<HHHHH", header, 0x18, 0x3E, 3, 0xFFFE, 9, 6)
+    struct.pack_into("<II", header, 0x2C, 1, 1)
+    struct.pack_into("<109I", header, 0x4C, 0, *([0xFFFFFFFF] * 108))
+
+    fat = struct.pack("<128I", 0xFFFFFFFD, 0xFFFFFFFE, *([0xFFFFFFFF] * 126))
+
+    directory = bytearray(512)
+    for index, (name, entry_type) in enumerate([("Root Entry", 5), (stream_name, 2)]):
+        raw_name = (name + "\x00").encode("utf-16-le")
+        directory[index * 128 : index * 128 + len(raw_name)] = raw_name
+        struct.pack_into(
+            "<HB", directory, index * 128 + 0x40, len(raw_name), entry_type
+        )
+
+    return bytes(header) + fat + bytes(directory)
+
+
+NATIVE_DATA = _ole2_file("Equation Native")
+OBJECT_DATA = _ole1_object(b"Equation.3", NATIVE_DATA)
+DOC_OBJECT = (
+    b"{\\rtf1{\\object\\objemb{\\*\\objclass Equation.3}{\\*\\objdata "
+    + OBJECT_DATA.hex().encode("ascii")
+    + b"}}}"
+)
+DOC_BINARY_OBJECT = (
+    b"{\\rtf1{\\object\\objemb{\\*\\objdata \\bin"
+    + str(len(OBJECT_DATA)).encode("ascii")
+    + b" "
+    + OBJECT_DATA
+    + b"}}}"
+)
+
+
+def test_object():
+    """
+    Check that an embedded object is decoded and the native data is hashed.
+    """
+    parser = RtfAnalyser(data=DOC_OBJECT)
+    assert "OBS008" in parser.results["observations"]
+    assert "{\\*\\objclass Equation.3}" in parser.results["loose_strings"]
+
+    embedded = parser.results["objects"][0]
+    assert embedded["class"] == "Equation.3"
+    assert embedded["size"] == len(NATIVE_DATA)
+    assert embedded["sha256"] == hashlib.sha256(NATIVE_DATA).hexdigest()
+    assert embedded["streams"] == ["Equation Native"]
+
+
+def test_binary_object():
+    """
+    Check that objects stored using \\bin are decoded the same as hex objects.
+    """
+    parser = RtfAnalyser(data=DOC_BINARY_OBJECT)
+    assert "OBS009" in parser.results["observations"]
+    assert parser.results["objects"] == RtfAnalyser(data=DOC_OBJECT).results["objects"]
+
+
+def test_obfuscated_hex():
+    """
+    Check that whitespace, junk characters, control words and ignorable groups are skipped,
+    including when they split a byte in two.
+    """
+    data = b"0\r\n1 02zz\\par 0{\\*\\junk 99}3{0}4}ff"
+    assert b"".join(iter_objdata(data, 0)) == b"\x01\x02\x03\x04"
+
+
+def test_odd_length_hex():
+    """
+    Check that a trailing nibble, or an unterminated group, does not raise an exception.
+    """
+    assert b"".join(iter_objdata(b"01020", 0)) == b"\x01\x02"
+
+
+def test_chunked_hex(monkeypatch):
+    """
+    Check that hex split across several chunks is decoded correctly.
+    """
+    monkeypatch.setattr("rtfsig.objects.CHUNK_SIZE", 3)
+    data = b"00 11 22 33 44 55}"
+    assert b"".join(iter_objdata(data, 0)) == bytes.fromhex("001122334455")
+
+    # Control words longer than a chunk are not split
+    data = b"01\\objdataobjdata 02}"
+    assert b"".join(iter_objdata(data, 0)) == b"\x01\x02"
+
+
+def test_interleaved_junk(monkeypatch):
+    """
+    Check that junk between every byte is removed, including groups and control words which
+    are split across segments.
+    """
+    monkeypatch.setattr("rtfsig.objects.INITIAL_CHUNK_SIZE", 16)
+    monkeypatch.setattr("rtfsig.objects.CHUNK_SIZE", 64)
+    junk = [b"\\par ", b"{}", b"{\\*\\junk 99}", b"{\\par}", b" {\\*{12}}\\~", b"\r\n"]
+    expected = bytes(range(256))
+    data = b"".join(b"%02x" % byte + junk[byte % len(junk)] for byte in expected)
+
+    assert b"".join(iter_objdata(data + b"}{\\*\\after 00}", 0)) == expected
+
+
+def test_nested_groups():
+    """
+    Check that groups split by \\bin, and an ignorable group containing other groups, are
+    handled.
+    """
+    data = b"01{02{\\*{99}\\bin1 X{99}}03}04}05"
+    assert b"".join(iter_objdata(data, 0)) == b"\x01\x02\x03\x04"
+
+
+class _CountingPattern:
+    """
+    Wrap a compiled regex and count the bytes searched.
+    """
+
+    def __init__(self, pattern, counter):
+        self._pattern = pattern
+        self._counter = counter
+
+    def search(self, data, pos, endpos=None):
+        endpos = len(data) if endpos is None else min(endpos, len(data))
+        self._counter.append(endpos - pos)
+        return self._pattern.search(data, pos, endpos)
+
+
+def _bytes_scanned(monkeypatch, data: bytes) -> int:
+    """
+    Find every object in `data` and return the number of bytes searched and stripped.
+    """
+    counter = []
+    strip_segment = objects._strip_segment
+
+    def counting_strip_segment(text, *args):
+        counter.append(len(text))
+        return strip_segment(text, *args)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(objects, "_BIN", _CountingPattern(objects._BIN, counter))
+        patch.setattr(objects, "_strip_segment", counting_strip_segment)
+        assert len(objects.find_objects(data)) == 1000
+
+    return sum(counter)
+
+
+def test_many_objects(monkeypatch):
+    """
+    Check that the work done for each object does not depend on the rest of the document, so
+    many small objects followed by a large tail are not slow.
+    """
+    small_objects = b"{\\*\\objdata 0102}" * 1000
+    short_tail = _bytes_scanned(monkeypatch, small_objects + b"{\\par text}" * 1000)
+    long_tail = _bytes_scanned(monkeypatch, small_objects + b"{\\par text}" * 100000)
+    assert long_tail == short_tail
+
+
+def test_large_binary_object(monkeypatch):
+    """
+    Check that a large object stored using \\bin is hashed without copying it.
+    """
+    monkeypatch.setattr("rtfsig.objects.OLE_PARSE_LIMIT", 1024)
+    native_data = bytes(8 * 1024 * 1024)
+    object_data = _ole1_object(b"Package", native_data)
+    data = b"\\bin%d %s}" % (len(object_data), object_data)
+
+    tracemalloc.start()
+    try:
+        embedded = analyse_object(iter_objdata(data, 0))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert embedded["sha256"] == hashlib.sha256(native_data).hexdigest()
+    assert peak < len(native_data) // 4
+
+
+def test_object_without_header():
+    """
+    Check that data without an OLE1 header is hashed in full.
+    """
+    embedded = analyse_object([b"\x01\x02", b"\x03"])
+    assert embedded["class"] is None
+    assert embedded["sha256"] == hashlib.sha256(b"\x01\x02\x03").hexdigest()
+
+    # Linked objects (format 1) and invalid string lengths are not parsed
+    linked = struct.pack("<II", 0x501, 1) + OBJECT_DATA[8:]
+    assert analyse_object([linked])["class"] is None
+    invalid_length = OBJECT_DATA[:8] + struct.pack("<I", 0xFFFFFFFF) + OBJECT_DATA[12:]
+    assert analyse_object([invalid_length])["class"] is None
+
+
+def test_object_truncated_header():
+    """
+    Check that an OLE1 header split across chunks is parsed, and native data is truncated to the
+    size given in the header.
+    """
+    chunks = [OBJECT_DATA[:10], OBJECT_DATA[10:], b"trailing data"]
+    embedded = analyse_object(chunks)
+    assert embedded["class"] == "Equation.3"
+    assert embedded["size"] == len(NATIVE_DATA)
+
+
+def test_invalid_ole2():
+    """
+    Check that files which are not a valid compound file return no stream names.
+    """
+    assert not ole_stream_names(b"not an OLE file")
+    invalid_sector_size = bytearray(NATIVE_DATA)
+    invalid_sector_size[0x1E] = 1
+    assert not ole_stream_names(bytes(invalid_sector_size))
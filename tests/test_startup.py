@@ -0,0 +1,56 @@
+"""
+Test the start-up cost of the command line app, which dominates when analysing single files.
+"""
+
+import subprocess
+import sys
+
+# Generous budget (in microseconds) for the time spent in rtfsig's own modules, excluding the
+# standard library (argparse and logging are most of the start-up time).  The current cost is
+# roughly 8ms.
+IMPORT_BUDGET = 25000
+
+
+def _import_times(module: str) -> dict:
+    """
+    Import a module in a new interpreter with -X importtime and return the time taken by each
+    module that was loaded, excluding the modules it imports.
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stderr
+
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_time, _, name = line.split("|")
+        times[name.strip()] = int(self_time.split(":")[1])
+
+    return times
+
+
+def test_lazy_imports():
+    """
+    Check that dependencies only needed for some documents or options are not loaded at
+    start-up.
+    """
+    times = _import_times("rtfsig.app")
+    for module in ["jinja2", "hashlib", "rtfsig.objects"]:
+        assert module not in times
+
+
+def test_import_budget():
+    """
+    Check that rtfsig's own modules stay within the start-up time budget.
+    """
+    times = _import_times("rtfsig.app")
+    own_time = sum(
+        time
+        for module, time in times.items()
+        if module == "rtfsig" or module.startswith("rtfsig.")
+    )
+    assert 0 < own_time < IMPORT_BUDGET
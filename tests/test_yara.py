@@ -1,9 +1,29 @@
 """
 Test the Yara utility functions.
 """
+
+import jinja2
 import plyara
+from rtfsig import VERSION_STRING
 from rtfsig.yara import generate_yara_rule
 
+# The Jinja2 template used by earlier versions, generated rules should be identical
+JINJA_TEMPLATE = """
+rule {{ rule_name }} {
+  meta:
+    description = "{{ description }}"
+    generated_by = "rtfsig version {{ version }}"
+
+  strings:
+    {% for string in strings -%}
+    $ = "{{ string }}" ascii
+    {% endfor %}
+  condition:
+    uint32be(0) == 0x7b5c7274 and any of them
+}
+
+"""
+
 
 def test_yara():
     """
@@ -16,3 +36,21 @@ def test_yara():
     parser = plyara.Plyara()
     rule = parser.parse_string(data)
     assert rule
+
+
+def test_jinja_compatible():
+    """
+    Check that rules are byte-identical to those generated by the previous Jinja2 template,
+    including escaping and rules with no strings.
+    """
+    template = jinja2.Template(JINJA_TEMPLATE)
+    for strings in [[], ["foo"], ['{\\author "blue"}', "rsid1234"]]:
+        expected = template.render(
+            rule_name="test_rule",
+            description="This is a test rule",
+            strings=[s.replace("\\", "\\\\").replace('"', '\\"') for s in strings],
+            version=VERSION_STRING,
+        )
+        assert (
+            generate_yara_rule("test_rule", "This is a test rule", strings) == expected
+        )